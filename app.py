@@ -2,6 +2,8 @@ import os
 import logging
 import uuid
 import asyncio
+import weakref
+import httpx
 from quart import (
     Blueprint,
     Quart,
@@ -19,12 +21,14 @@ from azure.identity.aio import (
 )
 from openai import AsyncAzureOpenAI
 from backend.auth.auth_utils import get_authenticated_user_details
+from backend.auth.cached_credential import CachedTokenCredential
 from backend.history.cosmosdbservice import CosmosConversationClient
 from backend.settings import app_settings
 from backend.utils import format_as_ndjson
 
 from backend.orchestration.chat import Chat
-from backend.search.aisearchservice import AiSearchService
+from backend.orchestration.semantic_cache import SemanticCache
+from backend.search.aisearchservice import get_search_service
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -39,20 +43,29 @@ def create_app():
     @app.before_serving
     async def init():
         try:
-            azure_credential = DefaultAzureCredential()
+            azure_credential = app.azure_credential = CachedTokenCredential(DefaultAzureCredential())
             
-            app.cosmos_conversation_client = await init_cosmosdb_client()
+            app.cosmos_conversation_client = await init_cosmosdb_client(azure_credential)
             cosmos_db_ready.set()
             
             token_provider = get_bearer_token_provider(azure_credential, "https://cognitiveservices.azure.com/.default")
-            app.openai_client =  AsyncAzureOpenAI(
-                api_version=app_settings.azure_openai.api_version,
-                azure_endpoint=app_settings.azure_openai.endpoint,
-                azure_ad_token_provider=token_provider,
-            )
+            app.openai_client = get_openai_client(token_provider)
             
-            app.search_service = AiSearchService(azure_credential, app_settings)
-            app.chat = Chat.create("helpdesk_assistant", token_provider, app.search_service)
+            app.search_service = get_search_service(azure_credential, app_settings)
+            app.search_service.start_warmup()
+            # One pooled client for the Helix API, shared by every chat
+            app.http_client = httpx.AsyncClient(
+                timeout=10.0, limits=httpx.Limits(max_keepalive_connections=20)
+            )
+            app.chat = Chat.create(
+                "helpdesk_assistant",
+                token_provider,
+                app.search_service,
+                init_semantic_cache(app.openai_client),
+                app.openai_client,
+                share_streams=app_settings.semantic_cache.share_streams,
+                http_client=app.http_client,
+            )
         except Exception as e:
             logging.exception("Failed to initialize clients")
             app.cosmos_conversation_client = None
@@ -60,9 +73,14 @@ def create_app():
             app.openai_client = None
             raise e
     
-    @bp.after_app_serving
+    @app.after_serving
     async def close_clients():
-        await app.search_service.dispose()
+        if app.search_service:
+            await app.search_service.dispose()
+        if getattr(app, "http_client", None):
+            await app.http_client.aclose()
+        if getattr(app, "azure_credential", None):
+            await app.azure_credential.close()
         
     app.register_blueprint(bp)
     
@@ -121,7 +139,7 @@ frontend_settings = {
 MS_DEFENDER_ENABLED = os.environ.get("MS_DEFENDER_ENABLED", "true").lower() == "true"
 
 
-async def init_cosmosdb_client():
+async def init_cosmosdb_client(azure_credential):
     cosmos_conversation_client = None
     if app_settings.chat_history:
         try:
@@ -130,9 +148,7 @@ async def init_cosmosdb_client():
             )
 
             if not app_settings.chat_history.account_key:
-                async with DefaultAzureCredential() as cred:
-                    credential = cred
-                    
+                credential = azure_credential
             else:
                 credential = app_settings.chat_history.account_key
 
@@ -153,17 +169,45 @@ async def init_cosmosdb_client():
     return cosmos_conversation_client
 
 
+_openai_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAzureOpenAI]" = weakref.WeakKeyDictionary()
+
+
+def get_openai_client(token_provider) -> AsyncAzureOpenAI:
+    """
+    Returns the AsyncAzureOpenAI client of the running event loop so that title generation,
+    embeddings and the chat kernel all share one connection pool.
+    """
+    loop = asyncio.get_running_loop()
+    openai_client = _openai_clients.get(loop)
+    if openai_client is None:
+        openai_client = _openai_clients[loop] = AsyncAzureOpenAI(
+            api_version=app_settings.azure_openai.api_version,
+            azure_endpoint=app_settings.azure_openai.endpoint,
+            azure_ad_token_provider=token_provider,
+        )
+
+    return openai_client
+
+
+def init_semantic_cache(openai_client):
+    if not app_settings.semantic_cache.enabled:
+        return None
+
+    if not app_settings.azure_openai.embedding_name:
+        logging.warning("Semantic cache is enabled but AZURE_OPENAI_EMBEDDING_NAME is not set")
+        return None
+
+    return SemanticCache(
+        openai_client,
+        app_settings.azure_openai.embedding_name,
+        similarity_threshold=app_settings.semantic_cache.similarity_threshold,
+        max_entries=app_settings.semantic_cache.max_entries,
+        latency_budget_ms=app_settings.semantic_cache.latency_budget_ms,
+    )
+
+
 async def conversation_internal(request_body, request_headers):
     try:
-        filtered_messages = []
-        messages = request_body.get("messages", [])
-        
-        for message in messages:
-            if message and message.get("role") != 'tool':
-                filtered_messages.append(message)
-                
-        request_body['messages'] = filtered_messages
-            
         result = await app.chat.invoke(request_body)
             
         response = await make_response(format_as_ndjson(result))
@@ -227,27 +271,31 @@ async def add_conversation():
         ## Format the incoming message object in the "chat/completions" messages format
         ## then write it to the conversation history in cosmos
         messages = request_json["messages"]
-        if len(messages) > 0 and messages[-1]["role"] == "user":
-            createdMessageValue = await current_app.cosmos_conversation_client.create_message(
+        if not (len(messages) > 0 and messages[-1]["role"] == "user"):
+            raise Exception("No user message found")
+
+        # Submit request to Chat Completions for response while the user message
+        # is written to cosmos; the response stream is only returned once it succeeded
+        request_body = await request.get_json()
+        history_metadata["conversation_id"] = conversation_id
+        request_body["history_metadata"] = history_metadata
+        createdMessageValue, response = await asyncio.gather(
+            current_app.cosmos_conversation_client.create_message(
                 uuid=str(uuid.uuid4()),
                 conversation_id=conversation_id,
                 user_id=user_id,
                 input_message=messages[-1],
+            ),
+            conversation_internal(request_body, request.headers),
+        )
+        if createdMessageValue == "Conversation not found":
+            raise Exception(
+                "Conversation not found for the given conversation ID: "
+                + conversation_id
+                + "."
             )
-            if createdMessageValue == "Conversation not found":
-                raise Exception(
-                    "Conversation not found for the given conversation ID: "
-                    + conversation_id
-                    + "."
-                )
-        else:
-            raise Exception("No user message found")
 
-        # Submit request to Chat Completions for response
-        request_body = await request.get_json()
-        history_metadata["conversation_id"] = conversation_id
-        request_body["history_metadata"] = history_metadata
-        return await conversation_internal(request_body, request.headers)
+        return response
 
     except Exception as e:
         logging.exception("Exception in /history/generate")
@@ -634,20 +682,26 @@ async def ensure_cosmos():
             return jsonify({"error": "CosmosDB is not working"}), 500
 
 
+TITLE_PROMPT_MESSAGE = {
+    "role": "user",
+    "content": "Summarize the conversation so far into a 4-word or less title. Do not use any quotation marks or punctuation. Do not include any other commentary or description.",
+}
+
+
 async def generate_title(conversation_messages) -> str:
     ## make sure the messages are sorted by _ts descending
-    title_prompt = "Summarize the conversation so far into a 4-word or less title. Do not use any quotation marks or punctuation. Do not include any other commentary or description."
-
+    # Tool messages only carry retrieved citations and are not needed for a title
     messages = [
         {"role": msg["role"], "content": msg["content"]}
         for msg in conversation_messages
+        if msg["role"] != "tool"
     ]
-    messages.append({"role": "user", "content": title_prompt})
+    messages.append(TITLE_PROMPT_MESSAGE)
 
     try:
         azure_openai_client = app.openai_client
         response = await azure_openai_client.chat.completions.create(
-            model=app_settings.azure_openai.model, messages=messages, temperature=1, max_tokens=64
+            model=app_settings.azure_openai.model, messages=messages, temperature=1, max_tokens=16
         )
 
         title = response.choices[0].message.content
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Tuple
+
+from azure.core.credentials import AccessToken
+from azure.core.credentials_async import AsyncTokenCredential
+
+# Cached tokens are handed out until this many seconds before they expire
+REFRESH_MARGIN = 300
+# Retry delay, and the shortest pause between background renewals
+RETRY_INTERVAL = 30
+
+
+class CachedTokenCredential:
+    """
+    Wraps an async credential, caching one token per scope set and renewing it in the
+    background ahead of expiry so that token acquisition stays off the request path.
+    """
+
+    def __init__(self, credential: AsyncTokenCredential, refresh_margin: float = REFRESH_MARGIN):
+        self.__credential = credential
+        self.refresh_margin = refresh_margin
+        self.__tokens: Dict[Tuple[str, ...], AccessToken] = {}
+        self.__locks: Dict[Tuple[str, ...], asyncio.Lock] = {}
+        self.__refresh_tasks: Dict[Tuple[str, ...], asyncio.Task] = {}
+
+    def __is_fresh(self, token: AccessToken) -> bool:
+        return token.expires_on > time.time() + self.refresh_margin
+
+    async def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+        if kwargs:
+            # Claims challenges and tenant overrides must always reach the credential
+            return await self.__credential.get_token(*scopes, **kwargs)
+
+        token = self.__tokens.get(scopes)
+        if token is not None and self.__is_fresh(token):
+            return token
+
+        # Concurrent callers wait for a single acquisition instead of each starting one
+        async with self.__locks.setdefault(scopes, asyncio.Lock()):
+            token = self.__tokens.get(scopes)
+            if token is None or not self.__is_fresh(token):
+                token = self.__tokens[scopes] = await self.__credential.get_token(*scopes)
+
+        if scopes not in self.__refresh_tasks:
+            self.__refresh_tasks[scopes] = asyncio.create_task(self.__refresh_periodically(scopes))
+
+        return token
+
+    async def __refresh_periodically(self, scopes: Tuple[str, ...]) -> None:
+        while True:
+            # Renew one margin ahead of the point where get_token would stop using the token
+            expires_on = self.__tokens[scopes].expires_on
+            delay = expires_on - time.time() - 2 * self.refresh_margin
+            await asyncio.sleep(max(delay, RETRY_INTERVAL))
+
+            try:
+                self.__tokens[scopes] = await self.__credential.get_token(*scopes)
+            except Exception:
+                logging.warning("Background token refresh failed", exc_info=True)
+
+    async def close(self) -> None:
+        tasks = list(self.__refresh_tasks.values())
+        self.__refresh_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        # A renewal still in flight must finish unwinding before the credential is closed
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.__credential.close()
+
+    async def __aenter__(self) -> "CachedTokenCredential":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
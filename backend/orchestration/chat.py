@@ -1,9 +1,18 @@
-from typing import Any, AsyncGenerator
+import asyncio
+import hashlib
+import logging
+import sys
+import weakref
+from contextlib import aclosing, suppress
+from typing import Any, AsyncGenerator, AsyncIterator
+import httpx
 from openai import AsyncAzureOpenAI
-from azure.search.documents.aio import SearchClient
 
 from semantic_kernel import Kernel
 from semantic_kernel.contents.chat_history import ChatHistory
+from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.contents.function_call_content import FunctionCallContent
+from semantic_kernel.contents.function_result_content import FunctionResultContent
 from semantic_kernel.prompt_template import InputVariable, PromptTemplateConfig
 from semantic_kernel.functions import KernelArguments, KernelFunction
 from semantic_kernel.connectors.ai.open_ai.services.azure_chat_completion import (
@@ -21,8 +30,23 @@ from semantic_kernel.contents.streaming_chat_message_content import (
 from semantic_kernel.contents.utils.author_role import AuthorRole
 from backend.search.aisearchservice import AiSearchService
 from .plugins import HelixProxyPlugin, AzureAISearchPlugin
+from .semantic_cache import SemanticCache
+from .shared_stream import SharedStream
 
-from backend.utils import format_stream_response
+from backend.utils import format_stream_response, merge_stream_responses
+
+# Role names parsed from request JSON are interned so they can be compared by identity
+ROLE_ASSISTANT = sys.intern("assistant")
+ROLE_USER = sys.intern("user")
+ROLE_TOOL = sys.intern("tool")
+
+# Answers produced after calling this plugin are user-specific (ticket templates) or had
+# side effects (ticket creation), so they are never stored in the semantic cache
+HELIX_PLUGIN_NAME = "helix_proxy_plugin"
+
+# Streamed deltas are coalesced into one response frame until either limit is reached
+STREAM_FLUSH_INTERVAL = 0.015
+STREAM_FLUSH_MAX_CHUNKS = 8
 
 system_message = """
 # System Instructions for AI Helpdesk Assistant
@@ -137,99 +161,325 @@ Error message: Not Found
 - **Seek clarification if unsure** before proceeding.
 """
 
+system_message_hash = hashlib.sha256(system_message.encode("utf-8")).hexdigest()
+
+# Azure OpenAI reuses cached prompt prefixes only when they are byte-identical, so the
+# system prompt message is built once and shared by every request's chat history.
+system_message_content = ChatMessageContent(role=AuthorRole.SYSTEM, content=system_message)
+
+prompt_template_config = PromptTemplateConfig(
+    template="{{$chat_history}}{{$user_input}}",
+    name="chat",
+    template_format="semantic-kernel",
+    input_variables=[
+        InputVariable(
+            name="chat_history",
+            description="The history of the conversation",
+            is_required=True,
+        ),
+        InputVariable(
+            name="user_input", description="The user input", is_required=True
+        ),
+    ],
+)
+
+# The prompt template is parsed once; kernels register a copy of the compiled function
+chat_prompt_function = KernelFunction.from_prompt(
+    function_name="Chat",
+    plugin_name="ChatBot",
+    prompt_template_config=prompt_template_config,
+)
+
+# Semantic Kernel deep-copies execution settings before applying per-request changes,
+# so a single instance can be shared by all invocations.
+execution_settings = AzureChatPromptExecutionSettings(
+    function_choice_behavior=FunctionChoiceBehavior.Auto()
+)
+
+async def _batch_stream(
+    source: AsyncIterator[Any], interval: float, max_items: int
+) -> AsyncGenerator[list[Any], None]:
+    """Groups streamed items into batches, flushing each one at most interval seconds late."""
+    queue: asyncio.Queue = asyncio.Queue()
+    end = object()
+
+    async def pump() -> None:
+        # The source is drained by a single task: Semantic Kernel keeps tracing spans open
+        # across its yields, and their context must be attached and detached in one task
+        try:
+            async for item in source:
+                queue.put_nowait(item)
+        finally:
+            queue.put_nowait(end)
+
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(pump())
+    batch = []
+    # The first item is flushed immediately so batching never delays time to first token
+    deadline = float("-inf")
+    try:
+        while True:
+            if not queue.empty():
+                item = queue.get_nowait()
+            elif batch:
+                # Items already waiting are flushed on time even if the source pauses
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    yield batch
+                    batch = []
+                    deadline = loop.time() + interval
+                    continue
+            else:
+                item = await queue.get()
+
+            if item is end:
+                break
+
+            batch.append(item)
+            if len(batch) >= max_items or loop.time() >= deadline:
+                yield batch
+                batch = []
+                deadline = loop.time() + interval
+
+        if batch:
+            yield batch
+        # Surfaces an error raised by the source
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+# Kernels are stateless between invocations, so one kernel is built per (chat id, token
+# provider, search service, OpenAI client, HTTP client) and shared by every Chat created
+# for it. Entries are weak so the cache never keeps a kernel, or the clients it holds,
+# alive on its own.
+kernel_cache: "weakref.WeakValueDictionary[tuple, Kernel]" = weakref.WeakValueDictionary()
+
 
 class Chat:
     def __init__(
-        self, kernel: Kernel | None = None, chat_function: KernelFunction | None = None
+        self,
+        kernel: Kernel | None = None,
+        chat_function: KernelFunction | None = None,
+        semantic_cache: SemanticCache | None = None,
+        share_streams: bool = False,
     ) -> None:
         self.__kernel = kernel
         self.__chat_function = chat_function
+        self.__semantic_cache = semantic_cache
+        self.__share_streams = share_streams
+        self.__inflight_streams: dict[str, SharedStream] = {}
 
     @staticmethod
-    def __get_kernel(service_id: str, token_provider, search_service: AiSearchService) -> Kernel:
+    def __get_kernel(
+        service_id: str,
+        token_provider,
+        search_service: AiSearchService,
+        openai_client: AsyncAzureOpenAI | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> Kernel:
         kernel = Kernel()
         kernel.add_service(
-            AzureChatCompletion(service_id=service_id, ad_token_provider=token_provider)
+            AzureChatCompletion(
+                service_id=service_id,
+                ad_token_provider=token_provider,
+                async_client=openai_client,
+            )
         )
         
         kernel.add_plugin(AzureAISearchPlugin(search_service), plugin_name="search_plugin")
-        kernel.add_plugin(HelixProxyPlugin(search_service), plugin_name="helix_proxy_plugin")
+        kernel.add_plugin(HelixProxyPlugin(search_service, http_client), plugin_name=HELIX_PLUGIN_NAME)
         return kernel
 
     @classmethod
-    def create(cls, chat_id: str, token_provider, search_service: AiSearchService) -> "Chat":
-        kernel = cls.__get_kernel(chat_id, token_provider, search_service)
-
-        prompt_template_config = PromptTemplateConfig(
-            template="{{$chat_history}}{{$user_input}}",
-            name="chat",
-            template_format="semantic-kernel",
-            input_variables=[
-                InputVariable(
-                    name="chat_history",
-                    description="The history of the conversation",
-                    is_required=True,
-                ),
-                InputVariable(
-                    name="user_input", description="The user input", is_required=True
-                ),
-            ],
-        )
-
-        chat_function = kernel.add_function(
-            plugin_name="ChatBot",
-            function_name="Chat",
-            prompt_template_config=prompt_template_config,
-        )
-
-        chat = cls(kernel, chat_function)
+    def create(
+        cls,
+        chat_id: str,
+        token_provider,
+        search_service: AiSearchService,
+        semantic_cache: SemanticCache | None = None,
+        openai_client: AsyncAzureOpenAI | None = None,
+        share_streams: bool = False,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> "Chat":
+        cache_key = (chat_id, token_provider, search_service, openai_client, http_client)
+        kernel = kernel_cache.get(cache_key)
+
+        if kernel is None:
+            kernel = cls.__get_kernel(chat_id, token_provider, search_service, openai_client, http_client)
+            kernel.add_function(plugin_name="ChatBot", function=chat_prompt_function)
+            kernel_cache[cache_key] = kernel
+
+        chat_function = kernel.get_function("ChatBot", chat_prompt_function.name)
+        chat = cls(kernel, chat_function, semantic_cache, share_streams)
 
         return chat
 
+    @staticmethod
+    def __add_messages(history: ChatHistory, request_messages: list[dict]) -> tuple[dict | None, int]:
+        add_message = {
+            ROLE_ASSISTANT: history.add_assistant_message,
+            ROLE_USER: history.add_user_message,
+        }
+
+        last_message = None
+        message_count = 0
+        previous_role = None
+        previous_content = None
+        for message in request_messages:
+            if not message:
+                continue
+
+            role = message.get("role")
+            if type(role) is str:
+                role = sys.intern(role)
+            if role is ROLE_TOOL:
+                continue
+
+            last_message = message
+            message_count += 1
+
+            add = add_message.get(role)
+            if add is not None:
+                content = message["content"]
+                if role is not previous_role:
+                    add(content)
+                elif content != previous_content:
+                    # Consecutive turns of the same role are sent as a single message
+                    history.messages.pop()
+                    content = f"{previous_content}\n{content}"
+                    add(content)
+                previous_content = content
+            # Any other role (e.g. system) separates the turns around it
+            previous_role = role
+
+        return last_message, message_count
+
     async def invoke(
         self,
         request_body
     ) -> AsyncGenerator[dict[str, Any] | dict, Any]:
         history = ChatHistory()
-        history.add_system_message(system_message)
+        history.messages.append(system_message_content)
 
         request_messages = request_body.get("messages", [])
 
-        filtered_messages = [
-            message for message in request_messages if message.get("role") != "tool"
-        ]
-
-        for message in filtered_messages:
-            if message:
-                if message["role"] == "assistant":
-                    history.add_assistant_message(message["content"])
-                elif message["role"] == "user":
-                    history.add_user_message(message["content"])
-
-        user_input = filtered_messages[-1]["content"]
-        
-        execution_settings = AzureChatPromptExecutionSettings(
-            function_choice_behavior=FunctionChoiceBehavior.Auto()
-        )
+        if (
+            len(request_messages) == 1
+            and request_messages[0]
+            and request_messages[0].get("role") == ROLE_USER
+        ):
+            # Opening turn: there is nothing to filter or collapse
+            last_message = request_messages[0]
+            message_count = 1
+            history.add_user_message(last_message["content"])
+        else:
+            last_message, message_count = self.__add_messages(history, request_messages)
+
+        if last_message is None:
+            raise ValueError("No chat messages found")
+
+        user_input = last_message["content"]
+
+        # Only the opening turn is served from the cache: later turns depend on the
+        # conversation so far (e.g. collecting ticket details) and must reach the model.
+        cache_embedding = None
+        cached_chunks = None
+        embedding_task = None
+        if self.__semantic_cache and message_count == 1:
+            if self.__semantic_cache.is_slow:
+                # The embedding endpoint is degraded: go straight to the model and only
+                # embed alongside it to keep the cache and the latency window populated
+                logging.debug("Semantic cache lookup skipped: embedding latency over budget")
+                embedding_task = asyncio.create_task(self.__semantic_cache.embed(user_input))
+                embedding_task.add_done_callback(
+                    lambda task: task.cancelled() or task.exception()
+                )
+            else:
+                try:
+                    cache_embedding = await self.__semantic_cache.embed(user_input)
+                    cached_chunks = self.__semantic_cache.lookup(system_message_hash, cache_embedding)
+                except Exception:
+                    logging.exception("Semantic cache lookup failed")
+                    cache_embedding = None
 
         arguments = KernelArguments(settings=execution_settings)
         arguments["user_input"] = user_input
         arguments["chat_history"] = history
 
-        async def generate():
+        # Set once the model calls the Helix plugin: such an answer must never be
+        # replayed from the semantic cache
+        called_helix = False
+
+        async def stream_chunks():
+            nonlocal called_helix
+            assistant_role = AuthorRole.ASSISTANT
             async for message in self.__kernel.invoke_stream(
                 self.__chat_function,
                 return_function_results=False,
                 arguments=arguments,
             ):
-                history_metadata = request_body.get("history_metadata", {})
                 msg = message[0]
 
+                if not called_helix and isinstance(msg, ChatMessageContent):
+                    called_helix = any(
+                        isinstance(item, (FunctionCallContent, FunctionResultContent))
+                        and item.plugin_name == HELIX_PLUGIN_NAME
+                        for item in msg.items
+                    )
+
                 if (
-                    isinstance(msg, StreamingChatMessageContent)
-                    and msg.role == AuthorRole.ASSISTANT
+                    type(msg) is StreamingChatMessageContent
+                    and msg.role is assistant_role
                     and msg.inner_content
                 ):
-                    yield format_stream_response(msg.inner_content, history_metadata, None)
+                    yield msg.inner_content
+
+        async def generate():
+            history_metadata = request_body.get("history_metadata", {})
+
+            if cached_chunks is not None:
+                for chunk in cached_chunks:
+                    yield format_stream_response(chunk, history_metadata, None)
+                return
+
+            # Identical opening questions asked concurrently share a single model stream
+            is_owner = True
+            if self.__share_streams and message_count == 1:
+                shared_stream = self.__inflight_streams.get(user_input)
+                if shared_stream is None:
+                    shared_stream = self.__inflight_streams[user_input] = SharedStream(
+                        stream_chunks(),
+                        on_done=lambda: self.__inflight_streams.pop(user_input, None),
+                    )
+                else:
+                    is_owner = False
+                source = shared_stream.subscribe()
+            else:
+                source = stream_chunks()
+
+            chunks = []
+            async with aclosing(
+                _batch_stream(source, STREAM_FLUSH_INTERVAL, STREAM_FLUSH_MAX_CHUNKS)
+            ) as batches:
+                async for batch in batches:
+                    chunks.extend(batch)
+                    yield merge_stream_responses(
+                        [format_stream_response(chunk, history_metadata, None) for chunk in batch]
+                    )
+
+            embedding = cache_embedding
+            if embedding_task is not None and is_owner and chunks and not called_helix:
+                try:
+                    embedding = await embedding_task
+                except Exception:
+                    logging.exception("Semantic cache embedding failed")
+
+            if is_owner and embedding is not None and chunks and not called_helix:
+                self.__semantic_cache.put(system_message_hash, embedding, chunks)
 
         return generate()
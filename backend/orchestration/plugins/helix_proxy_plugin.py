@@ -1,13 +1,16 @@
+import asyncio
 import json
 import logging
-from typing import Annotated, List, Optional
+from dataclasses import dataclass
+from typing import Annotated, List, Optional, Union
 from azure.search.documents.models import VectorizableTextQuery
-from pydantic import BaseModel
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
-import requests
+import httpx
 from backend.search.aisearchservice import AiSearchService
+from .search_results import to_documents
 
-class Document(BaseModel):
+@dataclass(slots=True)
+class Document:
     id: Optional[str] = None
     template_name: Optional[str] = None
     category_tier1: Optional[str] = None
@@ -22,9 +25,28 @@ class Document(BaseModel):
     score: Optional[float] = None
     reranker_score: Optional[float] = None
 
+
+# Index fields mapped onto Document, in Document field order
+SELECT_FIELDS = [
+    "HPD_Template_ID",
+    "chunk",
+    "Template_Category_Tier_1",
+    "Template_Category_Tier_2",
+    "Template_Category_Tier_3",
+    "Description",
+    "Detailed_Decription",
+    "Priority",
+    "Urgency",
+    "Assigned_Group",
+    "Assigned_Group_ID",
+]
+
+
 class HelixProxyPlugin:
-    def __init__(self, search_service: AiSearchService, **kwargs):
+    def __init__(self, search_service: AiSearchService, http_client: Optional[httpx.AsyncClient] = None, **kwargs):
         self.__search_service = search_service
+        # Owned by the app, which closes it on shutdown
+        self.__http_client = http_client
         self.minimum_search_score = kwargs.get("minimum_search_score", 0.0)
         self.minimum_reranker_score = kwargs.get("minimum_reranker_score", 0.0)
         
@@ -34,9 +56,9 @@ class HelixProxyPlugin:
     )
     async def get_ticket_templates(
         self,
-        category: Annotated[
-            str,
-            "The category of the incident as provided by the user.",
+        categories: Annotated[
+            Union[str, List[str]],
+            "One or more categories of the incident as provided by the user.",
         ],
         description: Annotated[
             str,
@@ -46,48 +68,42 @@ class HelixProxyPlugin:
         List[Document], "Returns one or more templates to be considered for support ticket creation."
     ]:
         logging.info(f"Searching for: {description}")
-        
+
+        if isinstance(categories, str):
+            categories = [categories]
+
         vectors = [VectorizableTextQuery(kind="text", text=description, k_nearest_neighbors=50, fields="text_vector")]
-        results = await self.__search_service.search_templates(query_text=description, filter=f"Template_Category_Tier_2 eq '{category}'", vectors=vectors)
-        
+
+        # One search per category, issued concurrently and merged in category order
+        results_list = await asyncio.gather(
+            *[self.__search_templates(category, description, vectors) for category in dict.fromkeys(categories)]
+        )
+
         documents = []
-        async for page in results.by_page():
-            async for document in page:
-                documents.append(
-                    Document(
-                        id=document.get("HPD_Template_ID"),
-                        template_name=document.get("chunk"),
-                        category_tier1=document.get("Template_Category_Tier_1"),
-                        category_tier2=document.get("Template_Category_Tier_2"),
-                        category_tier3=document.get("Template_Category_Tier_3"),
-                        description=document.get("Description"),
-                        detailed_description=document.get("Detailed_Decription"),
-                        priority=document.get("Priority"),
-                        urgency=document.get("Urgency"),
-                        assigned_group=document.get("Assigned_Group"),
-                        assigned_group_id=document.get("Assigned_Group_ID"),
-                        score=document.get("@search.score"),
-                        reranker_score=document.get("@search.reranker_score"),
-                    )
-                )
-
-            qualified_documents = [
-                doc
-                for doc in documents
-                if (
-                    (doc.score or 0) >= (self.minimum_search_score or 0)
-                    and (doc.reranker_score or 0) >= (self.minimum_reranker_score or 0)
-                )
-            ]
-
-        return qualified_documents
+        seen_ids = set()
+        for results in results_list:
+            for document in results:
+                # Templates without an id cannot be matched across categories and are all kept
+                if document.id is not None:
+                    if document.id in seen_ids:
+                        continue
+                    seen_ids.add(document.id)
+                documents.append(document)
+
+        return documents
+
+    async def __search_templates(self, category: str, description: str, vectors: List[VectorizableTextQuery]) -> List[Document]:
+        results = await self.__search_service.search_templates(query_text=description, filter=f"Template_Category_Tier_2 eq '{category}'", vectors=vectors, select=SELECT_FIELDS)
 
+        return to_documents(
+            results, Document, SELECT_FIELDS, self.minimum_search_score, self.minimum_reranker_score
+        )
 
     @kernel_function(
         name="create_ticket",
         description="Creates a support ticket in the Helix system based on the template name and the detailed description.",
     )
-    def create_ticket(
+    async def create_ticket(
         self,
         template_name: Annotated[
             str,
@@ -119,7 +135,7 @@ class HelixProxyPlugin:
         }
 
         try:
-            # response = requests.post(API_URL, json=payload, headers=headers)
+            # response = await self.__http_client.post(API_URL, json=payload, headers=headers)
             # response.raise_for_status()  # Raise an exception for HTTP errors
 
             logging.log(
@@ -128,5 +144,5 @@ class HelixProxyPlugin:
             )
 
             return json.dumps({"ticket_id": 12345, "status": "success"})
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError:
             return json.dumps({"status": "error"})
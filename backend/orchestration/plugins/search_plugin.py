@@ -1,18 +1,24 @@
 import logging
+from dataclasses import dataclass
 from typing import Annotated, List, Optional
-from pydantic import BaseModel
 from azure.search.documents.models import VectorizableTextQuery
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 from backend.search.aisearchservice import AiSearchService
+from .search_results import to_documents
 
-class Document(BaseModel):
+@dataclass(slots=True)
+class Document:
     id: Optional[str] = None
     parent_id: Optional[str] = None
     content: Optional[str] = None
     title: Optional[str] = None
     score: Optional[float] = None
     reranker_score: Optional[float] = None
-    
+
+
+# Index fields mapped onto Document, in Document field order
+SELECT_FIELDS = ["id", "parent_id", "content", "title"]
+
 
 class AzureAISearchPlugin:
     def __init__(self, search_service: AiSearchService, **kwargs):
@@ -44,29 +50,8 @@ class AzureAISearchPlugin:
         logging.info(f"Searching for: {query}")
         
         vectors = [VectorizableTextQuery(kind="text", text=query, k_nearest_neighbors=50, fields="text_vector")]
-        results = await self.__search_service.search_knowledge(query_text=query, filter=None, vectors=vectors)
-        
-        documents = []
-        async for page in results.by_page():
-            async for document in page:
-                documents.append(
-                    Document(
-                        id=document.get("id"),
-                        parent_id=document.get("parent_id"),
-                        content=document.get("content"),
-                        title=document.get("title"),
-                        score=document.get("@search.score"),
-                        reranker_score=document.get("@search.reranker_score"),
-                    )
-                )
-
-            qualified_documents = [
-                doc
-                for doc in documents
-                if (
-                    (doc.score or 0) >= (self.minimum_search_score or 0)
-                    and (doc.reranker_score or 0) >= (self.minimum_reranker_score or 0)
-                )
-            ]
+        results = await self.__search_service.search_knowledge(query_text=query, filter=None, vectors=vectors, select=SELECT_FIELDS)
 
-        return qualified_documents
\ No newline at end of file
+        return to_documents(
+            results, Document, SELECT_FIELDS, self.minimum_search_score, self.minimum_reranker_score
+        )
\ No newline at end of file
@@ -0,0 +1,33 @@
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def to_documents(
+    results: List[Dict],
+    document_type: Callable[..., T],
+    fields: Sequence[str],
+    minimum_search_score: Optional[float] = None,
+    minimum_reranker_score: Optional[float] = None,
+) -> List[T]:
+    """
+    Builds documents from raw search hits whose scores meet the thresholds. The values of
+    fields are passed positionally, followed by the score and the reranker score.
+    """
+    minimum_search_score = minimum_search_score or 0
+    minimum_reranker_score = minimum_reranker_score or 0
+
+    documents = []
+    for hit in results:
+        # Filter on the raw hit so that documents below the thresholds are never materialized
+        score = hit.get("@search.score")
+        reranker_score = hit.get("@search.reranker_score")
+        if (score or 0) < minimum_search_score or (reranker_score or 0) < minimum_reranker_score:
+            continue
+
+        # hit.get rather than itemgetter: without $select a hit may lack some of the fields
+        documents.append(
+            document_type(*map(hit.get, fields), score=score, reranker_score=reranker_score)
+        )
+
+    return documents
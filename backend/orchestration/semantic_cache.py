@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from openai import AsyncAzureOpenAI
+
+# Latency samples are only trusted once the window holds enough of them
+LATENCY_WINDOW = 256
+LATENCY_MIN_SAMPLES = 20
+
+
+class _CacheEntries:
+    """Fixed-capacity ring buffer of unit-normalized embeddings and their responses."""
+
+    __slots__ = ("vectors", "responses", "count", "next_index")
+
+    def __init__(self, capacity: int, dimensions: int):
+        # One contiguous float32 matrix keeps the similarity scan a single BLAS call
+        self.vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.responses: List[Optional[List[Any]]] = [None] * capacity
+        self.count = 0
+        self.next_index = 0
+
+
+class SemanticCache:
+    """
+    In-process cache of streamed chat responses keyed by the embedding of the user input.
+
+    Entries are partitioned by namespace (e.g. a hash of the system prompt) so that
+    responses produced under different instructions never cross-contaminate.
+    """
+
+    def __init__(
+        self,
+        openai_client: AsyncAzureOpenAI,
+        embedding_model: str,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 1000,
+        max_embeddings: int = 1024,
+        latency_budget_ms: float = 300,
+    ):
+        self.__openai_client = openai_client
+        self.__embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.__entries: Dict[str, _CacheEntries] = {}
+        self.max_embeddings = max_embeddings
+        self.__embeddings: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.latency_budget_ms = latency_budget_ms
+        self.__latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def is_slow(self) -> bool:
+        """True when the p99 latency of recent embedding calls exceeds the budget."""
+        if len(self.__latencies) < LATENCY_MIN_SAMPLES:
+            return False
+
+        # "higher" avoids interpolating with the infinite samples recorded for failures
+        p99 = np.percentile(self.__latencies, 99, method="higher")
+        return p99 > self.latency_budget_ms
+
+    async def embed(self, text: str) -> np.ndarray:
+        # Repeated inputs skip the embedding round-trip entirely
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        vector = self.__embeddings.get(key)
+        if vector is not None:
+            self.__embeddings.move_to_end(key)
+            return vector
+
+        start = time.perf_counter()
+        try:
+            response = await self.__openai_client.embeddings.create(
+                model=self.__embedding_model, input=text
+            )
+        except Exception:
+            self.__latencies.append(float("inf"))
+            raise
+        self.__latencies.append((time.perf_counter() - start) * 1000)
+
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        self.__embeddings[key] = vector
+        if len(self.__embeddings) > self.max_embeddings:
+            self.__embeddings.popitem(last=False)
+        return vector
+
+    def lookup(self, namespace: str, embedding: np.ndarray) -> Optional[List[Any]]:
+        entries = self.__entries.get(namespace)
+        if entries is None or entries.count == 0:
+            return None
+
+        scores = entries.vectors[: entries.count] @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        logging.debug(f"Semantic cache hit with similarity {scores[best]:.3f}")
+        return entries.responses[best]
+
+    def put(self, namespace: str, embedding: np.ndarray, chunks: List[Any]) -> None:
+        entries = self.__entries.get(namespace)
+        if entries is None:
+            entries = self.__entries[namespace] = _CacheEntries(
+                self.max_entries, embedding.shape[0]
+            )
+
+        # Once full, the oldest entry is overwritten first
+        index = entries.next_index
+        entries.vectors[index] = embedding
+        entries.responses[index] = chunks
+        entries.next_index = (index + 1) % self.max_entries
+        entries.count = min(entries.count + 1, self.max_entries)
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, List, Optional
+
+
+class _Subscription:
+    """Async iterator that holds its subscriber slot from creation until it is exhausted or closed."""
+
+    def __init__(self, items: AsyncGenerator[Any, None], on_close: Callable[[], None]):
+        self.__items = items
+        self.__on_close: Optional[Callable[[], None]] = on_close
+
+    def __aiter__(self) -> "_Subscription":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await anext(self.__items)
+        except BaseException:
+            self.__close()
+            raise
+
+    async def aclose(self) -> None:
+        await self.__items.aclose()
+        self.__close()
+
+    def __close(self) -> None:
+        on_close, self.__on_close = self.__on_close, None
+        if on_close:
+            on_close()
+
+    def __del__(self) -> None:
+        # A subscription dropped before it was ever read still gives up its slot
+        self.__close()
+
+
+class SharedStream:
+    """
+    Consumes a single async iterator in a background task and lets any number of
+    subscribers receive all of its items, including the ones produced before they joined.
+    """
+
+    def __init__(self, source: AsyncIterator[Any], on_done: Optional[Callable[[], None]] = None):
+        self.__items: List[Any] = []
+        self.__error: Optional[Exception] = None
+        self.__done = False
+        self.__changed = asyncio.Condition()
+        self.__on_done = on_done
+        self.__subscribers = 0
+        self.__task = asyncio.create_task(self.__pump(source))
+
+    async def __pump(self, source: AsyncIterator[Any]) -> None:
+        try:
+            async for item in source:
+                async with self.__changed:
+                    self.__items.append(item)
+                    self.__changed.notify_all()
+        except Exception as e:
+            self.__error = e
+        finally:
+            async with self.__changed:
+                self.__done = True
+                self.__changed.notify_all()
+
+            self.__notify_done()
+
+    def __notify_done(self) -> None:
+        on_done, self.__on_done = self.__on_done, None
+        if on_done:
+            on_done()
+
+    def __unsubscribe(self) -> None:
+        self.__subscribers -= 1
+        if self.__subscribers == 0 and not self.__done:
+            # Nobody is listening anymore: stop the source instead of running it to the end
+            self.__error = RuntimeError("Shared stream cancelled: every subscriber left")
+            self.__task.cancel()
+            # Detach right away so that no new subscriber can join a cancelled stream
+            self.__notify_done()
+
+    def subscribe(self) -> AsyncIterator[Any]:
+        # Counted as soon as it joins, not on its first read, so that leaving subscribers
+        # cannot cancel the stream under one that has not started reading yet
+        self.__subscribers += 1
+        return _Subscription(self.__iterate(), self.__unsubscribe)
+
+    async def __iterate(self) -> AsyncGenerator[Any, None]:
+        index = 0
+        while True:
+            async with self.__changed:
+                await self.__changed.wait_for(lambda: index < len(self.__items) or self.__done)
+                items = self.__items[index:]
+                done = self.__done
+
+            index += len(items)
+            for item in items:
+                yield item
+
+            if done:
+                if self.__error:
+                    raise self.__error
+                return
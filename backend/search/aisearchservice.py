@@ -1,4 +1,13 @@
-from typing import Dict, List, Optional
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import suppress
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import aiohttp
+from azure.core.pipeline.transport import AioHttpTransport
 from azure.search.documents.aio import SearchClient, AsyncSearchItemPaged
 from azure.search.documents.models import (
     VectorQuery,
@@ -8,18 +17,48 @@ from azure.search.documents.models import (
 from azure.identity.aio import DefaultAzureCredential
 from backend.settings import AppSettings
 
+
+# Upper bound on batch searches in flight per service, shared by all concurrent search_batch
+# calls, to stay within the service tier's limits
+MAX_CONCURRENT_BATCH_SEARCHES = 16
+
+
+def _vector_key(vector: VectorQuery) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in vector.as_dict().items()
+    )
+
+
+def _copy_documents(documents: List[Dict]) -> List[Dict]:
+    # Cached hits are shared by every caller, so each one gets its own list and hits
+    return [dict(document) for document in documents]
+
+
 class AiSearchService:
     def __init__(self, azure_credential: DefaultAzureCredential, app_settings: AppSettings, **kwargs):
+        # Both indexes live on the same service, so their clients share one connection pool.
+        # Cookie and decompression options mirror the session azure-core would create itself.
+        self.__session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            auto_decompress=False,
+            trust_env=True,
+        )
+        transport = AioHttpTransport(session=self.__session, session_owner=False)
+
         self.__knowledge_search_client = SearchClient(
                 endpoint=app_settings.datasource.endpoint,
                 index_name=app_settings.datasource.index,
                 credential=azure_credential,
+                transport=transport,
         )
         
         self.__template_search_client = SearchClient(
             endpoint=app_settings.datasource.endpoint,
             index_name= app_settings.datasource.template_index,
             credential=azure_credential,
+            transport=transport,
         )
 
         self.top = app_settings.datasource.top_k
@@ -27,57 +66,218 @@ class AiSearchService:
         self.use_vector_search = app_settings.datasource.use_vector_search
         self.use_semantic_search = app_settings.datasource.use_semantic_search
         self.use_semantic_captions = app_settings.datasource.use_semantic_captions
+        self.use_select = app_settings.datasource.use_select
+
+        # Request options that only depend on configuration are bound once, read-only
+        # since the same mapping is unpacked into every request
+        self.__search_kwargs = MappingProxyType({"top": self.top})
+        self.__semantic_search_kwargs = MappingProxyType({
+            "top": self.top,
+            "query_type": QueryType.SEMANTIC,
+            "semantic_configuration_name": "default",
+            "query_caption": QueryCaptionType.EXTRACTIVE if self.use_semantic_captions else None,
+        })
 
+        # Identical searches within the TTL are answered from memory, least recently used evicted first
+        self.cache_ttl = app_settings.datasource.cache_ttl_seconds
+        self.cache_max_entries = app_settings.datasource.cache_max_entries
+        self.__cache: OrderedDict[Hashable, Tuple[float, List[Dict]]] = OrderedDict()
+        self.__inflight: Dict[Hashable, asyncio.Task] = {}
+        self.__batch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCH_SEARCHES)
+        self.__warmup_task: Optional[asyncio.Task] = None
 
     async def search_knowledge(
         self,
         query_text: Optional[str],
         filter: Optional[str],
         vectors: List[VectorQuery],
-    ) -> AsyncSearchItemPaged[Dict]:
-        return await self.__search_internal(self.__knowledge_search_client, query_text, filter, vectors)
+        select: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        return await self.__search_internal(self.__knowledge_search_client, query_text, filter, vectors, select)
     
     async def search_templates(
         self,
         query_text: Optional[str],
         filter: Optional[str],
         vectors: List[VectorQuery],
-    ) -> AsyncSearchItemPaged[Dict]:
-        return await self.__search_internal(self.__template_search_client, query_text, filter, vectors)
+        select: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        return await self.__search_internal(self.__template_search_client, query_text, filter, vectors, select)
     
+    async def search_all(
+        self,
+        query_text: Optional[str],
+        filter: Optional[str],
+        vectors: List[VectorQuery],
+        select: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """Searches the knowledge and template indexes concurrently."""
+        knowledge_results, template_results = await asyncio.gather(
+            self.__search_internal(self.__knowledge_search_client, query_text, filter, vectors, select),
+            self.__search_internal(self.__template_search_client, query_text, filter, vectors, select),
+        )
+        return knowledge_results, template_results
+
+    async def search_batch(
+        self,
+        queries: List[Tuple[Optional[str], Optional[str], List[VectorQuery]]],
+        select: Optional[List[str]] = None,
+    ) -> List[List[Dict]]:
+        """Runs several knowledge searches concurrently and returns their hits in query order."""
+        async def search(query_text: Optional[str], filter: Optional[str], vectors: List[VectorQuery]) -> List[Dict]:
+            async with self.__batch_semaphore:
+                return await self.__search_internal(
+                    self.__knowledge_search_client, query_text, filter, vectors, select
+                )
+
+        return list(await asyncio.gather(*[search(*query) for query in queries]))
+
     async def __search_internal( 
         self,
         search_client: SearchClient,
         query_text: Optional[str],
         filter: Optional[str],
         vectors: List[VectorQuery],
+        select: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        if not (self.use_text_search or self.use_vector_search or self.use_semantic_search):
+            # Every search mode is disabled: there is nothing to send
+            return []
+
+        if not self.use_select:
+            # A field missing from the index would fail the whole search, so $select is opt-in
+            select = None
+
+        key = (
+            search_client,
+            query_text,
+            filter,
+            tuple(select) if select else None,
+            tuple(_vector_key(vector) for vector in vectors),
+        )
+
+        if self.cache_ttl:
+            cached = self.__cache.get(key)
+            if cached is not None:
+                expires_at, documents = cached
+                if expires_at > time.monotonic():
+                    self.__cache.move_to_end(key)
+                    return _copy_documents(documents)
+                del self.__cache[key]
+
+        # Identical searches in flight at the same time share a single request
+        task = self.__inflight.get(key)
+        if task is None:
+            task = self.__inflight[key] = asyncio.create_task(
+                self.__download(key, search_client, query_text, filter, vectors, select)
+            )
+            task.add_done_callback(lambda _: self.__inflight.pop(key, None))
+
+        # Shielded so that one caller going away does not cancel the request for the others
+        return _copy_documents(await asyncio.shield(task))
+
+    async def __download(
+        self,
+        key: Hashable,
+        search_client: SearchClient,
+        query_text: Optional[str],
+        filter: Optional[str],
+        vectors: List[VectorQuery],
+        select: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        results = await self.__query(search_client, query_text, filter, vectors, select)
+        documents = [document async for document in results]
+
+        if self.cache_ttl:
+            self.__cache[key] = (time.monotonic() + self.cache_ttl, documents)
+            if len(self.__cache) > self.cache_max_entries:
+                self.__cache.popitem(last=False)
+
+        return documents
+
+    async def __query(
+        self,
+        search_client: SearchClient,
+        query_text: Optional[str],
+        filter: Optional[str],
+        vectors: List[VectorQuery],
+        select: Optional[List[str]] = None,
     ) -> AsyncSearchItemPaged[Dict]:
-        
         search_text = query_text if self.use_text_search else ""
         search_vectors = vectors if self.use_vector_search else []
+        # Without query text the semantic ranker has no signal, so it is not invoked (nor billed)
+        use_semantic = self.use_semantic_search and bool(query_text) and not query_text.isspace()
         
-        if self.use_semantic_search:
-            results = await search_client.search(
-                search_text=search_text,
-                filter=filter,
-                top=self.top,
-                query_caption=QueryCaptionType.EXTRACTIVE if self.use_semantic_captions else None,
-                vector_queries=search_vectors,
-                query_type=QueryType.SEMANTIC,
-                semantic_configuration_name="default",
-                semantic_query=query_text,
-            )
-        else:
-            results = await search_client.search(
-                search_text=search_text,
-                filter=filter,
-                top=self.top,
-                vector_queries=search_vectors,
-            )
-
-        return results
+        return await search_client.search(
+            search_text=search_text,
+            filter=filter,
+            select=select,
+            vector_queries=search_vectors,
+            semantic_query=query_text if use_semantic else None,
+            **(self.__semantic_search_kwargs if use_semantic else self.__search_kwargs),
+        )
         
     
-    def dispose(self):
-        self.__knowledge_search_client.close()
-        self.__template_search_client.close()
\ No newline at end of file
+    async def warmup(self) -> None:
+        """
+        Issues a minimal query against both indexes so that the credential token,
+        the TLS connections and the search endpoint are ready before the first user query.
+        """
+        await asyncio.gather(
+            self.__warmup_client(self.__knowledge_search_client),
+            self.__warmup_client(self.__template_search_client),
+        )
+
+    @staticmethod
+    async def __warmup_client(search_client: SearchClient) -> None:
+        # The query is only sent once the results are iterated
+        results = await search_client.search(search_text="*", top=1)
+        async for _ in results:
+            pass
+
+    def start_warmup(self, interval: float = 300) -> None:
+        if self.__warmup_task is None:
+            self.__warmup_task = asyncio.create_task(self.__rewarm_periodically(interval))
+
+    async def __rewarm_periodically(self, interval: float) -> None:
+        while True:
+            try:
+                await self.warmup()
+            except Exception:
+                logging.warning("Search warmup failed", exc_info=True)
+            await asyncio.sleep(interval)
+
+    async def dispose(self):
+        if self.__warmup_task is not None:
+            # A warmup still in flight may be using the session that is closed below
+            self.__warmup_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.__warmup_task
+            self.__warmup_task = None
+        await asyncio.gather(
+            self.__knowledge_search_client.close(),
+            self.__template_search_client.close(),
+        )
+        # The clients do not own the shared session, so it is closed last
+        await self.__session.close()
+
+        # A later get_search_service on this loop must not hand out the closed clients
+        loop = asyncio.get_running_loop()
+        if _search_services.get(loop) is self:
+            del _search_services[loop]
+
+
+_search_services: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AiSearchService]" = weakref.WeakKeyDictionary()
+
+
+def get_search_service(azure_credential: DefaultAzureCredential, app_settings: AppSettings) -> AiSearchService:
+    """
+    Returns the AiSearchService of the running event loop so that every chat shares the same
+    SearchClient instances and their HTTP connection pools, which are bound to the loop.
+    """
+    loop = asyncio.get_running_loop()
+    search_service = _search_services.get(loop)
+    if search_service is None:
+        search_service = _search_services[loop] = AiSearchService(azure_credential, app_settings)
+
+    return search_service
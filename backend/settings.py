@@ -1,4 +1,6 @@
 import os
+from functools import lru_cache
+from pathlib import Path
 from pydantic import (
     BaseModel,
     confloat,
@@ -9,24 +11,78 @@ from pydantic import (
     ValidationError,
 )
 from pydantic.alias_generators import to_snake
-from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Literal, Optional
+from pydantic.fields import FieldInfo
+from pydantic_settings import (
+    BaseSettings,
+    DotEnvSettingsSource,
+    PydanticBaseSettingsSource,
+    SettingsConfigDict,
+)
+from typing import Any, Dict, List, Literal, Optional, Tuple, Type
 from typing_extensions import Self
 from quart import Request
 from backend.utils import parse_multi_columns
 
-DOTENV_PATH = os.environ.get(
-    "DOTENV_PATH",
-    os.path.join(
-        os.path.dirname(
-            os.path.dirname(__file__)
-        ),
-        ".env"
-    )
+DOTENV_PATH = Path(
+    os.environ.get("DOTENV_PATH") or Path(__file__).resolve().parents[1] / ".env"
 )
 AZURE_OPENAI_API_VERSION = "2024-09-01-preview"
 
-class _UiSettings(BaseSettings):
+
+# Field values read from .env, per settings class and dotenv options
+_dotenv_values: Dict[Tuple, Dict[str, Any]] = {}
+
+
+class _CachedDotEnvSettingsSource(PydanticBaseSettingsSource):
+    """
+    Wraps the dotenv source pydantic-settings built for this instance, including any
+    _env_file overrides, and reuses its values whenever the same settings class is built
+    again with the same dotenv options.
+    """
+
+    def __init__(self, settings_cls: Type[BaseSettings], dotenv_settings: DotEnvSettingsSource):
+        super().__init__(settings_cls)
+        self.__dotenv_settings = dotenv_settings
+        env_file = dotenv_settings.env_file
+        self.__key = (
+            settings_cls,
+            tuple(env_file) if isinstance(env_file, (list, tuple)) else env_file,
+            dotenv_settings.env_file_encoding,
+            dotenv_settings.case_sensitive,
+            dotenv_settings.env_prefix,
+            dotenv_settings.env_nested_delimiter,
+            dotenv_settings.env_ignore_empty,
+            dotenv_settings.env_parse_none_str,
+        )
+
+    def get_field_value(self, field: FieldInfo, field_name: str) -> Tuple[Any, str, bool]:
+        return self.__dotenv_settings.get_field_value(field, field_name)
+
+    def __call__(self) -> Dict[str, Any]:
+        values = _dotenv_values.get(self.__key)
+        if values is None:
+            values = _dotenv_values[self.__key] = self.__dotenv_settings()
+        return dict(values)
+
+
+class _DotEnvSettings(BaseSettings):
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: Type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: DotEnvSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> Tuple[PydanticBaseSettingsSource, ...]:
+        return (
+            init_settings,
+            env_settings,
+            _CachedDotEnvSettingsSource(settings_cls, dotenv_settings),
+            file_secret_settings,
+        )
+
+class _UiSettings(_DotEnvSettings):
     model_config = SettingsConfigDict(
         env_prefix="UI_",
         env_file=DOTENV_PATH,
@@ -44,7 +100,7 @@ class _UiSettings(BaseSettings):
     show_chat_history_button: bool = True
 
 
-class _ChatHistorySettings(BaseSettings):
+class _ChatHistorySettings(_DotEnvSettings):
     model_config = SettingsConfigDict(
         env_prefix="AZURE_COSMOSDB_",
         env_file=DOTENV_PATH,
@@ -58,7 +114,7 @@ class _ChatHistorySettings(BaseSettings):
     conversations_container: str
     enable_feedback: bool = False
 
-class _AzureOpenAISettings(BaseSettings):
+class _AzureOpenAISettings(_DotEnvSettings):
     model_config = SettingsConfigDict(
         env_prefix="AZURE_OPENAI_",
         env_file=DOTENV_PATH,
@@ -100,7 +156,7 @@ class _AzureOpenAISettings(BaseSettings):
         raise ValidationError("AZURE_OPENAI_ENDPOINT or AZURE_OPENAI_RESOURCE is required")
 
 
-class _AzureSearchSettings(BaseSettings):
+class _AzureSearchSettings(_DotEnvSettings):
     model_config = SettingsConfigDict(
         env_prefix="AZURE_SEARCH_",
         env_file=DOTENV_PATH,
@@ -117,6 +173,10 @@ class _AzureSearchSettings(BaseSettings):
     use_vector_search: bool = Field(default=True, exclude=True)
     use_semantic_search: bool = Field(default=False, exclude=True)
     use_semantic_captions: bool = Field(default=False, exclude=True)
+    # Fetch only the fields the plugins read; requires every one of them to exist in the index
+    use_select: bool = Field(default=False, exclude=True)
+    cache_ttl_seconds: float = Field(default=60, ge=0, exclude=True)
+    cache_max_entries: int = Field(default=256, gt=0, exclude=True)
     
     # Constructed fields
     endpoint: Optional[str] = None
@@ -126,7 +186,23 @@ class _AzureSearchSettings(BaseSettings):
         self.endpoint = f"https://{self.service}.{self.endpoint_suffix}"
         return self
         
-class _BaseSettings(BaseSettings):
+class _SemanticCacheSettings(_DotEnvSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="SEMANTIC_CACHE_",
+        env_file=DOTENV_PATH,
+        extra="ignore",
+        env_ignore_empty=True
+    )
+
+    enabled: bool = False
+    similarity_threshold: float = Field(default=0.92, ge=0.0, le=1.0)
+    max_entries: int = Field(default=1000, gt=0)
+    latency_budget_ms: float = Field(default=300, gt=0)
+    # Identical opening questions asked concurrently share one model stream
+    share_streams: bool = False
+
+
+class _BaseSettings(_DotEnvSettings):
     model_config = SettingsConfigDict(
         env_file=DOTENV_PATH,
         extra="ignore",
@@ -140,10 +216,11 @@ class _BaseSettings(BaseSettings):
 
 
 class AppSettings(BaseModel):
-    base_settings: _BaseSettings = _BaseSettings()
-    azure_openai: _AzureOpenAISettings = _AzureOpenAISettings()
-    datasource: _AzureSearchSettings = _AzureSearchSettings()
-    ui: Optional[_UiSettings] = _UiSettings()
+    base_settings: _BaseSettings = Field(default_factory=_BaseSettings)
+    azure_openai: _AzureOpenAISettings = Field(default_factory=_AzureOpenAISettings)
+    datasource: _AzureSearchSettings = Field(default_factory=_AzureSearchSettings)
+    ui: Optional[_UiSettings] = Field(default_factory=_UiSettings)
+    semantic_cache: _SemanticCacheSettings = Field(default_factory=_SemanticCacheSettings)
     
     # Constructed properties
     chat_history: Optional[_ChatHistorySettings] = None
@@ -158,4 +235,14 @@ class AppSettings(BaseModel):
         
         return self
 
-app_settings = AppSettings()
+
+@lru_cache(maxsize=1)
+def get_app_settings() -> AppSettings:
+    return AppSettings()
+
+
+def __getattr__(name: str):
+    # app_settings is built on first access rather than at import
+    if name == "app_settings":
+        return get_app_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
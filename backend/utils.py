@@ -22,13 +22,25 @@ class JSONEncoder(json.JSONEncoder):
         return super().default(o)
 
 
+try:
+    import orjson
+
+    def dumps(obj) -> str:
+        # orjson serializes dataclasses natively and is several times faster than json
+        return orjson.dumps(obj).decode("utf-8")
+
+except ImportError:
+    def dumps(obj) -> str:
+        return json.dumps(obj, cls=JSONEncoder)
+
+
 async def format_as_ndjson(r):
     try:
         async for event in r:
-            yield json.dumps(event, cls=JSONEncoder) + "\n"
+            yield dumps(event) + "\n"
     except Exception as error:
         logging.exception("Exception while generating response stream: %s", error)
-        yield json.dumps({"error": str(error)})
+        yield dumps({"error": str(error)})
 
 
 def parse_multi_columns(columns: str) -> list:
@@ -90,7 +102,7 @@ def format_stream_response(chatCompletionChunk, history_metadata, apim_request_i
         delta = chatCompletionChunk.choices[0].delta
         if delta:
             if hasattr(delta, "context"):
-                messageObj = {"role": "tool", "content": json.dumps(delta.context)}
+                messageObj = {"role": "tool", "content": dumps(delta.context)}
                 response_obj["choices"][0]["messages"].append(messageObj)
                 return response_obj
             if delta.role == "assistant" and hasattr(delta, "context"):
@@ -112,6 +124,37 @@ def format_stream_response(chatCompletionChunk, history_metadata, apim_request_i
     return {}
 
 
+def merge_stream_responses(responses):
+    """
+    Merge formatted stream responses into a single response, concatenating
+    consecutive assistant content deltas.
+    """
+    merged = {}
+    for response in responses:
+        if not response:
+            continue
+
+        if not merged:
+            merged = response
+            continue
+
+        merged_messages = merged["choices"][0]["messages"]
+        for message in response["choices"][0]["messages"]:
+            previous = merged_messages[-1] if merged_messages else None
+            if (
+                previous
+                and previous["role"] == "assistant"
+                and message["role"] == "assistant"
+                and "content" in previous
+                and "content" in message
+            ):
+                previous["content"] += message["content"]
+            else:
+                merged_messages.append(message)
+
+    return merged
+
+
 def comma_separated_string_to_list(s: str) -> List[str]:
     '''
     Split comma-separated values into a list.
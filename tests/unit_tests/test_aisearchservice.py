@@ -0,0 +1,245 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from azure.search.documents.models import QueryCaptionType, QueryType
+from backend.search import aisearchservice
+from backend.search.aisearchservice import AiSearchService
+
+
+class AsyncResults:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def __aiter__(self):
+        for document in self.documents:
+            yield document
+
+
+class DummySearchClient:
+    instances = {}
+
+    def __init__(self, endpoint, index_name, credential, **kwargs):
+        self.index_name = index_name
+        self.calls = []
+        self.closed = False
+        DummySearchClient.instances[index_name] = self
+
+    async def close(self):
+        self.closed = True
+
+    async def search(self, **kwargs):
+        self.calls.append(kwargs)
+        return AsyncResults([{"id": f"{self.index_name}-{len(self.calls)}"}])
+
+
+def make_app_settings(**datasource):
+    defaults = dict(
+        endpoint="https://search.example",
+        index="knowledge",
+        template_index="templates",
+        top_k=5,
+        use_text_search=True,
+        use_vector_search=True,
+        use_semantic_search=False,
+        use_semantic_captions=False,
+        use_select=False,
+        cache_ttl_seconds=60,
+        cache_max_entries=2,
+    )
+    defaults.update(datasource)
+    return SimpleNamespace(datasource=SimpleNamespace(**defaults))
+
+
+@pytest_asyncio.fixture
+async def create_service(monkeypatch):
+    monkeypatch.setattr(aisearchservice, "SearchClient", DummySearchClient)
+    services = []
+
+    def create(**datasource):
+        service = AiSearchService(None, make_app_settings(**datasource))
+        services.append(service)
+        return service
+
+    yield create
+
+    for service in services:
+        await service.dispose()
+
+
+@pytest.mark.asyncio
+async def test_search_results_are_cached(create_service):
+    service = create_service()
+
+    first = await service.search_knowledge("reset password", None, [])
+    second = await service.search_knowledge("reset password", None, [])
+    other_index = await service.search_templates("reset password", None, [])
+
+    assert first == second == [{"id": "knowledge-1"}]
+    assert other_index == [{"id": "templates-1"}]
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_not_shared_with_callers(create_service):
+    service = create_service()
+
+    first = await service.search_knowledge("reset password", None, [])
+    first[0]["id"] = "changed"
+    first.append({"id": "extra"})
+
+    assert await service.search_knowledge("reset password", None, []) == [{"id": "knowledge-1"}]
+
+
+@pytest.mark.asyncio
+async def test_search_cache_evicts_least_recently_used(create_service):
+    service = create_service()
+
+    await service.search_knowledge("a", None, [])
+    await service.search_knowledge("b", None, [])
+    await service.search_knowledge("a", None, [])
+    await service.search_knowledge("c", None, [])
+
+    assert await service.search_knowledge("a", None, []) == [{"id": "knowledge-1"}]
+    assert await service.search_knowledge("b", None, []) == [{"id": "knowledge-4"}]
+
+
+@pytest.mark.asyncio
+async def test_search_cache_disabled(create_service):
+    service = create_service(cache_ttl_seconds=0)
+
+    await service.search_knowledge("a", None, [])
+    results = await service.search_knowledge("a", None, [])
+
+    assert results == [{"id": "knowledge-2"}]
+
+
+@pytest.mark.asyncio
+async def test_warmup_queries_both_indexes(create_service):
+    service = create_service()
+
+    await service.warmup()
+    await service.search_knowledge("a", None, [])
+
+    knowledge_client = DummySearchClient.instances["knowledge"]
+    template_client = DummySearchClient.instances["templates"]
+    assert knowledge_client.calls[0] == {"search_text": "*", "top": 1}
+    assert template_client.calls == [{"search_text": "*", "top": 1}]
+    assert len(knowledge_client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_share_one_request(create_service):
+    service = create_service(cache_ttl_seconds=0)
+
+    first, second = await asyncio.gather(
+        service.search_knowledge("a", None, []),
+        service.search_knowledge("a", None, []),
+    )
+
+    assert first == second == [{"id": "knowledge-1"}]
+    assert len(DummySearchClient.instances["knowledge"].calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_dispose_closes_clients(create_service):
+    service = create_service()
+
+    await service.dispose()
+
+    assert DummySearchClient.instances["knowledge"].closed
+    assert DummySearchClient.instances["templates"].closed
+
+
+@pytest.mark.asyncio
+async def test_dispose_waits_for_warmup(monkeypatch, create_service):
+    class SlowSearchClient(DummySearchClient):
+        async def search(self, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                # Releasing the connection takes a moment
+                await asyncio.sleep(0.01)
+                self.stopped_before_close = not self.closed
+                raise
+
+    monkeypatch.setattr(aisearchservice, "SearchClient", SlowSearchClient)
+    service = create_service()
+    service.start_warmup()
+    await asyncio.sleep(0.01)
+
+    await service.dispose()
+
+    assert DummySearchClient.instances["knowledge"].stopped_before_close
+    assert DummySearchClient.instances["templates"].stopped_before_close
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_options(create_service):
+    service = create_service(use_semantic_search=True, use_semantic_captions=True, use_select=True)
+
+    await service.search_knowledge("reset password", None, [], select=["id"])
+
+    assert DummySearchClient.instances["knowledge"].calls == [
+        {
+            "search_text": "reset password",
+            "filter": None,
+            "select": ["id"],
+            "vector_queries": [],
+            "semantic_query": "reset password",
+            "top": 5,
+            "query_type": QueryType.SEMANTIC,
+            "semantic_configuration_name": "default",
+            "query_caption": QueryCaptionType.EXTRACTIVE,
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_select_ignored_unless_enabled(create_service):
+    service = create_service()
+
+    await service.search_knowledge("reset password", None, [], select=["id"])
+
+    assert DummySearchClient.instances["knowledge"].calls[0]["select"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_all_queries_both_indexes(create_service):
+    service = create_service(use_select=True)
+
+    knowledge, templates = await service.search_all("reset password", "x eq 1", [], select=["id"])
+
+    assert knowledge == [{"id": "knowledge-1"}]
+    assert templates == [{"id": "templates-1"}]
+    for index_name in ("knowledge", "templates"):
+        call = DummySearchClient.instances[index_name].calls[0]
+        assert (call["search_text"], call["filter"], call["select"]) == ("reset password", "x eq 1", ["id"])
+
+
+@pytest.mark.asyncio
+async def test_search_batch(create_service):
+    service = create_service()
+
+    results = await service.search_batch([("a", None, []), ("b", "x eq 1", []), ("a", None, [])])
+
+    assert results == [[{"id": "knowledge-1"}], [{"id": "knowledge-2"}], [{"id": "knowledge-1"}]]
+    assert [call["filter"] for call in DummySearchClient.instances["knowledge"].calls] == [None, "x eq 1"]
+
+
+@pytest.mark.asyncio
+async def test_search_skipped_when_all_modes_disabled(create_service):
+    service = create_service(use_text_search=False, use_vector_search=False, use_semantic_search=False)
+
+    assert await service.search_knowledge("a", None, []) == []
+    assert DummySearchClient.instances["knowledge"].calls == []
+
+
+@pytest.mark.asyncio
+async def test_semantic_ranker_skipped_without_query_text(create_service):
+    service = create_service(use_semantic_search=True)
+
+    await service.search_knowledge("  ", None, [])
+
+    call = DummySearchClient.instances["knowledge"].calls[0]
+    assert call["semantic_query"] is None
+    assert "query_type" not in call
@@ -0,0 +1,66 @@
+import asyncio
+import time
+import pytest
+from azure.core.credentials import AccessToken
+from backend.auth.cached_credential import CachedTokenCredential
+
+
+class DummyCredential:
+    def __init__(self, lifetime):
+        self.lifetime = lifetime
+        self.calls = []
+        self.closed = False
+
+    async def get_token(self, *scopes, **kwargs):
+        self.calls.append((scopes, kwargs))
+        return AccessToken(f"token-{len(self.calls)}", int(time.time() + self.lifetime))
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_cached_token_is_reused():
+    credential = DummyCredential(lifetime=3600)
+    async with CachedTokenCredential(credential) as cached:
+        first = await cached.get_token("scope")
+        second = await cached.get_token("scope")
+        other = await cached.get_token("other")
+
+    assert first is second
+    assert other.token == "token-2"
+    assert credential.closed
+
+
+@pytest.mark.asyncio
+async def test_expiring_token_is_renewed():
+    credential = DummyCredential(lifetime=60)
+    async with CachedTokenCredential(credential, refresh_margin=300) as cached:
+        first = await cached.get_token("scope")
+        second = await cached.get_token("scope")
+
+    assert first.token == "token-1"
+    assert second.token == "token-2"
+
+
+@pytest.mark.asyncio
+async def test_token_options_bypass_cache():
+    credential = DummyCredential(lifetime=3600)
+    async with CachedTokenCredential(credential) as cached:
+        await cached.get_token("scope")
+        await cached.get_token("scope", claims="challenge")
+
+    assert credential.calls == [(("scope",), {}), (("scope",), {"claims": "challenge"})]
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_background_refresh():
+    credential = DummyCredential(lifetime=3600)
+    cached = CachedTokenCredential(credential)
+    await cached.get_token("scope")
+    refresh_task = next(task for task in asyncio.all_tasks() if task is not asyncio.current_task())
+
+    await cached.close()
+
+    assert refresh_task.done()
+    assert credential.closed
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import logging
+import pytest
+from types import SimpleNamespace
+from semantic_kernel import Kernel
+from semantic_kernel.functions import kernel_function
+from semantic_kernel.contents.function_call_content import FunctionCallContent
+from semantic_kernel.contents.streaming_chat_message_content import StreamingChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+from backend.orchestration.chat import Chat
+from backend.orchestration.semantic_cache import SemanticCache
+
+
+def make_chunk(text):
+    return SimpleNamespace(
+        id="chunk",
+        model="model",
+        created=1,
+        object="chat.completion.chunk",
+        choices=[SimpleNamespace(delta=SimpleNamespace(role="assistant", content=text))],
+    )
+
+
+class DummyKernel:
+    def __init__(self, texts=("Hello",), call_function=None, pause_before=None, pause=0.0):
+        self.texts = texts
+        self.call_function = call_function
+        self.pause_before = pause_before
+        self.pause = pause
+        self.calls = []
+
+    async def invoke_stream(self, function, return_function_results, arguments):
+        self.calls.append(arguments)
+        if self.call_function:
+            yield [
+                StreamingChatMessageContent(
+                    role=AuthorRole.ASSISTANT,
+                    content=None,
+                    items=[FunctionCallContent(id="call", name=self.call_function)],
+                    choice_index=0,
+                    inner_content=make_chunk(None),
+                )
+            ]
+        for text in self.texts:
+            if text == self.pause_before:
+                await asyncio.sleep(self.pause)
+            yield [
+                StreamingChatMessageContent(
+                    role=AuthorRole.ASSISTANT,
+                    content=text,
+                    choice_index=0,
+                    inner_content=make_chunk(text),
+                )
+            ]
+
+
+async def invoke(chat, messages):
+    return [response async for response in await chat.invoke({"messages": messages})]
+
+
+def history_of(kernel):
+    arguments = kernel.calls[-1]
+    # The first message is always the system prompt
+    return [(message.role.value, message.content) for message in arguments["chat_history"].messages[1:]]
+
+
+@pytest.mark.asyncio
+async def test_consecutive_turns_are_collapsed():
+    kernel = DummyKernel()
+    chat = Chat(kernel, None)
+
+    await invoke(
+        chat,
+        [
+            {"role": "user", "content": "hi"},
+            {"role": "user", "content": "my printer is broken"},
+            {"role": "tool", "content": "{}"},
+            {"role": "assistant", "content": "which printer?"},
+            {"role": "user", "content": "the one on floor 2"},
+        ],
+    )
+
+    assert history_of(kernel) == [
+        ("user", "hi\nmy printer is broken"),
+        ("assistant", "which printer?"),
+        ("user", "the one on floor 2"),
+    ]
+    assert kernel.calls[-1]["user_input"] == "the one on floor 2"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_turns_are_dropped():
+    kernel = DummyKernel()
+    chat = Chat(kernel, None)
+
+    await invoke(
+        chat,
+        [
+            {"role": "user", "content": "hi"},
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "hello"},
+            {"role": "user", "content": "help"},
+        ],
+    )
+
+    assert history_of(kernel) == [("user", "hi"), ("assistant", "hello"), ("user", "help")]
+
+
+@pytest.mark.asyncio
+async def test_other_roles_separate_turns():
+    kernel = DummyKernel()
+    chat = Chat(kernel, None)
+
+    await invoke(
+        chat,
+        [
+            {"role": "user", "content": "a"},
+            {"role": "system", "content": "ignored"},
+            {"role": "user", "content": "b"},
+        ],
+    )
+
+    assert history_of(kernel) == [("user", "a"), ("user", "b")]
+
+
+@pytest.mark.asyncio
+async def test_single_user_message():
+    kernel = DummyKernel(["Hel", "lo"])
+    chat = Chat(kernel, None)
+
+    responses = await invoke(chat, [{"role": "user", "content": "hi"}])
+
+    assert history_of(kernel) == [("user", "hi")]
+    assert "".join(
+        response["choices"][0]["messages"][0]["content"] for response in responses
+    ) == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_parsed_roles_are_interned():
+    kernel = DummyKernel()
+    chat = Chat(kernel, None)
+    # Roles decoded from JSON are not the interned literals used by Chat
+    messages = json.loads(
+        '[{"role": "user", "content": "a"}, {"role": "user", "content": "b"},'
+        ' {"role": "tool", "content": "{}"}, {"role": "assistant", "content": "c"}]'
+    )
+
+    await invoke(chat, messages)
+
+    assert history_of(kernel) == [("user", "a\nb"), ("assistant", "c")]
+
+
+@pytest.mark.asyncio
+async def test_null_messages_are_skipped():
+    kernel = DummyKernel()
+    chat = Chat(kernel, None)
+
+    await invoke(chat, [None, {"role": "user", "content": "hi"}, {}])
+
+    assert history_of(kernel) == [("user", "hi")]
+
+    with pytest.raises(ValueError):
+        await chat.invoke({"messages": [None]})
+
+
+@pytest.mark.asyncio
+async def test_pending_deltas_are_flushed_while_the_model_pauses():
+    kernel = DummyKernel(["A", "B", "C"], pause_before="C", pause=0.5)
+    chat = Chat(kernel, None)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    received = []
+    async for response in await chat.invoke({"messages": [{"role": "user", "content": "hi"}]}):
+        received.append((response["choices"][0]["messages"][0]["content"], loop.time() - start))
+
+    assert "".join(content for content, _ in received) == "ABC"
+    assert received[-1][0] == "C"
+    assert all(elapsed < 0.25 for _, elapsed in received[:-1])
+
+
+@pytest.mark.asyncio
+async def test_identical_opening_questions_share_a_stream_when_enabled():
+    for share_streams, expected_calls in ((False, 2), (True, 1)):
+        kernel = DummyKernel(["A", "B"], pause_before="B", pause=0.01)
+        chat = Chat(kernel, None, share_streams=share_streams)
+
+        first, second = await asyncio.gather(
+            invoke(chat, [{"role": "user", "content": "hi"}]),
+            invoke(chat, [{"role": "user", "content": "hi"}]),
+        )
+
+        assert len(kernel.calls) == expected_calls
+        assert "".join(contents(first)) == "".join(contents(second)) == "AB"
+
+
+class StreamingPlugin:
+    @kernel_function(name="chat")
+    async def chat(self, user_input: str = ""):
+        for text in ("A", "B"):
+            await asyncio.sleep(0.01)
+            yield [
+                StreamingChatMessageContent(
+                    role=AuthorRole.ASSISTANT,
+                    content=text,
+                    choice_index=0,
+                    inner_content=make_chunk(text),
+                )
+            ]
+
+
+@pytest.mark.asyncio
+async def test_kernel_stream_keeps_its_tracing_context(caplog):
+    kernel = Kernel()
+    chat_function = kernel.add_plugin(StreamingPlugin(), plugin_name="ChatBot")["chat"]
+    chat = Chat(kernel, chat_function)
+
+    with caplog.at_level(logging.ERROR):
+        responses = await invoke(
+            chat,
+            [
+                {"role": "user", "content": "hi"},
+                {"role": "assistant", "content": "hello"},
+                {"role": "user", "content": "help"},
+            ],
+        )
+
+    assert "".join(contents(responses)) == "AB"
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+class DummyEmbeddings:
+    async def create(self, model, input):
+        vectors = {"reset password": [1.0, 0.0], "support hours": [0.0, 1.0]}
+        return SimpleNamespace(data=[SimpleNamespace(embedding=vectors[input])])
+
+
+def make_semantic_cache():
+    return SemanticCache(SimpleNamespace(embeddings=DummyEmbeddings()), "embedding")
+
+
+def contents(responses):
+    # Deltas without content (e.g. tool calls) are streamed as empty frames
+    return [response["choices"][0]["messages"][0]["content"] for response in responses if response]
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_hit_skips_the_model():
+    kernel = DummyKernel(["Open ", "settings"])
+    chat = Chat(kernel, None, make_semantic_cache())
+
+    first = await invoke(chat, [{"role": "user", "content": "reset password"}])
+    second = await invoke(chat, [{"role": "user", "content": "reset password"}])
+
+    assert len(kernel.calls) == 1
+    assert "".join(contents(second)) == "".join(contents(first)) == "Open settings"
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_miss_reaches_the_model():
+    kernel = DummyKernel()
+    chat = Chat(kernel, None, make_semantic_cache())
+
+    await invoke(chat, [{"role": "user", "content": "reset password"}])
+    await invoke(chat, [{"role": "user", "content": "support hours"}])
+
+    assert len(kernel.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_skips_responses_that_called_helix():
+    kernel = DummyKernel(["Ticket created"], call_function="helix_proxy_plugin-create_ticket")
+    chat = Chat(kernel, None, make_semantic_cache())
+
+    await invoke(chat, [{"role": "user", "content": "reset password"}])
+    await invoke(chat, [{"role": "user", "content": "reset password"}])
+
+    assert len(kernel.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_stores_search_backed_answers():
+    kernel = DummyKernel(["Open settings"], call_function="search_plugin-search")
+    chat = Chat(kernel, None, make_semantic_cache())
+
+    await invoke(chat, [{"role": "user", "content": "reset password"}])
+    second = await invoke(chat, [{"role": "user", "content": "reset password"}])
+
+    assert len(kernel.calls) == 1
+    assert "".join(contents(second)) == "Open settings"
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from semantic_kernel import Kernel
+from semantic_kernel.functions import KernelArguments
+from backend.orchestration.plugins.helix_proxy_plugin import HelixProxyPlugin
+
+
+class DummySearchService:
+    def __init__(self, templates):
+        self.templates = templates
+        self.filters = []
+
+    async def search_templates(self, query_text, filter, vectors, select=None):
+        self.filters.append(filter)
+        category = filter.split("'")[1]
+        await asyncio.sleep(0)
+        return self.templates.get(category, [])
+
+
+@pytest.mark.asyncio
+async def test_ticket_templates_are_searched_per_category():
+    search_service = DummySearchService(
+        {
+            "Hardware": [
+                {"HPD_Template_ID": "t1", "chunk": "Printer"},
+                {"HPD_Template_ID": None, "chunk": "Monitor"},
+            ],
+            "Network": [
+                {"HPD_Template_ID": "t1", "chunk": "Printer"},
+                {"HPD_Template_ID": "t2", "chunk": "VPN"},
+                {"HPD_Template_ID": None, "chunk": "Wi-Fi"},
+            ],
+        }
+    )
+    plugin = HelixProxyPlugin(search_service)
+
+    documents = await plugin.get_ticket_templates(["Hardware", "Network", "Hardware"], "broken")
+
+    assert search_service.filters == [
+        "Template_Category_Tier_2 eq 'Hardware'",
+        "Template_Category_Tier_2 eq 'Network'",
+    ]
+    assert [document.template_name for document in documents] == ["Printer", "Monitor", "VPN", "Wi-Fi"]
+
+
+@pytest.mark.asyncio
+async def test_ticket_templates_accept_a_single_category():
+    search_service = DummySearchService({"Hardware": [{"HPD_Template_ID": "t1", "chunk": "Printer"}]})
+    kernel = Kernel()
+    plugin = kernel.add_plugin(HelixProxyPlugin(search_service), plugin_name="helix_proxy_plugin")
+
+    result = await kernel.invoke(
+        plugin["get_ticket_templates"],
+        KernelArguments(categories="Hardware", description="broken"),
+    )
+
+    assert [document.id for document in result.value] == ["t1"]
@@ -0,0 +1,20 @@
+from backend.orchestration.plugins.search_plugin import SELECT_FIELDS, Document
+from backend.orchestration.plugins.search_results import to_documents
+
+
+def test_hits_below_the_thresholds_are_skipped():
+    results = [
+        {"id": "1", "title": "kept", "@search.score": 0.9, "@search.reranker_score": 2.5},
+        {"id": "2", "@search.score": 0.1, "@search.reranker_score": 2.5},
+        {"id": "3", "@search.score": 0.9, "@search.reranker_score": 1.0},
+    ]
+
+    documents = to_documents(results, Document, SELECT_FIELDS, 0.5, 2.0)
+
+    assert documents == [Document(id="1", title="kept", score=0.9, reranker_score=2.5)]
+
+
+def test_missing_fields_map_to_none():
+    documents = to_documents([{"id": "1"}], Document, SELECT_FIELDS)
+
+    assert documents == [Document(id="1")]
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from backend.orchestration.semantic_cache import LATENCY_MIN_SAMPLES, SemanticCache
+
+
+class DummyEmbeddings:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    async def create(self, model, input):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self.vectors[input])])
+
+
+@pytest.fixture
+def semantic_cache():
+    client = SimpleNamespace(
+        embeddings=DummyEmbeddings(
+            {
+                "reset password": [1.0, 0.0, 0.0],
+                "how to reset my password": [0.99, 0.1, 0.0],
+                "support hours": [0.0, 1.0, 0.0],
+            }
+        )
+    )
+    return SemanticCache(client, "embedding", similarity_threshold=0.9, max_entries=2)
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_hit(semantic_cache):
+    embedding = await semantic_cache.embed("reset password")
+    semantic_cache.put("ns", embedding, ["chunk1", "chunk2"])
+
+    similar = await semantic_cache.embed("how to reset my password")
+    assert semantic_cache.lookup("ns", similar) == ["chunk1", "chunk2"]
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_miss(semantic_cache):
+    embedding = await semantic_cache.embed("reset password")
+    semantic_cache.put("ns", embedding, ["chunk1"])
+
+    other = await semantic_cache.embed("support hours")
+    assert semantic_cache.lookup("ns", other) is None
+    assert semantic_cache.lookup("other_ns", embedding) is None
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_evicts_oldest(semantic_cache):
+    semantic_cache.put("ns", np.array([1.0, 0.0, 0.0], dtype=np.float32), ["a"])
+    semantic_cache.put("ns", np.array([0.0, 1.0, 0.0], dtype=np.float32), ["b"])
+    semantic_cache.put("ns", np.array([0.0, 0.0, 1.0], dtype=np.float32), ["c"])
+
+    assert semantic_cache.lookup("ns", np.array([1.0, 0.0, 0.0], dtype=np.float32)) is None
+    assert semantic_cache.lookup("ns", np.array([0.0, 0.0, 1.0], dtype=np.float32)) == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_reuses_embeddings():
+    calls = []
+
+    class CountingEmbeddings(DummyEmbeddings):
+        async def create(self, model, input):
+            calls.append(input)
+            return await super().create(model, input)
+
+    client = SimpleNamespace(
+        embeddings=CountingEmbeddings(
+            {"reset password": [1.0, 0.0, 0.0], "support hours": [0.0, 1.0, 0.0]}
+        )
+    )
+    semantic_cache = SemanticCache(client, "embedding", max_embeddings=1)
+
+    first = await semantic_cache.embed("reset password")
+    second = await semantic_cache.embed("reset password")
+    assert first is second
+    assert calls == ["reset password"]
+
+    await semantic_cache.embed("support hours")
+    await semantic_cache.embed("reset password")
+    assert calls == ["reset password", "support hours", "reset password"]
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_is_slow_after_failures(semantic_cache):
+    assert not semantic_cache.is_slow
+
+    for i in range(LATENCY_MIN_SAMPLES):
+        with pytest.raises(KeyError):
+            await semantic_cache.embed(f"unknown {i}")
+
+    assert semantic_cache.is_slow
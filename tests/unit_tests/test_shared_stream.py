@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from backend.orchestration.shared_stream import SharedStream
+
+
+@pytest.mark.asyncio
+async def test_shared_stream_replays_to_late_subscribers():
+    calls = []
+
+    async def source():
+        calls.append(1)
+        for item in ["a", "b", "c"]:
+            await asyncio.sleep(0.01)
+            yield item
+
+    done = asyncio.Event()
+    shared = SharedStream(source(), on_done=done.set)
+
+    async def collect():
+        return [item async for item in shared.subscribe()]
+
+    first = asyncio.create_task(collect())
+    await asyncio.sleep(0.015)
+    second = asyncio.create_task(collect())
+
+    assert await first == ["a", "b", "c"]
+    assert await second == ["a", "b", "c"]
+    assert calls == [1]
+    assert done.is_set()
+
+
+@pytest.mark.asyncio
+async def test_shared_stream_propagates_errors():
+    async def source():
+        yield "a"
+        raise RuntimeError("upstream failed")
+
+    shared = SharedStream(source())
+
+    items = []
+    with pytest.raises(RuntimeError):
+        async for item in shared.subscribe():
+            items.append(item)
+    assert items == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_shared_stream_cancelled_when_every_subscriber_leaves():
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield "a"
+        finally:
+            closed.set()
+
+    done = asyncio.Event()
+    shared = SharedStream(source(), on_done=done.set)
+
+    first = shared.subscribe()
+    second = shared.subscribe()
+    assert await anext(first) == "a"
+    assert await anext(second) == "a"
+
+    await first.aclose()
+    await asyncio.sleep(0.03)
+    assert not closed.is_set()
+
+    await second.aclose()
+    await asyncio.wait_for(closed.wait(), 1)
+    assert done.is_set()
+
+
+@pytest.mark.asyncio
+async def test_shared_stream_counts_subscribers_that_have_not_read_yet():
+    async def source():
+        for item in ["a", "b"]:
+            await asyncio.sleep(0.01)
+            yield item
+
+    shared = SharedStream(source())
+
+    first = shared.subscribe()
+    assert await anext(first) == "a"
+    second = shared.subscribe()
+    await first.aclose()
+
+    assert [item async for item in second] == ["a", "b"]
@@ -1,5 +1,6 @@
+import json
 import pytest
-from backend.utils import format_as_ndjson, parse_multi_columns
+from backend.utils import format_as_ndjson, merge_stream_responses, parse_multi_columns
 
 
 @pytest.mark.asyncio
@@ -8,7 +9,8 @@ async def test_format_as_ndjson():
         yield {"message": "test message\n"}
 
     async for event in format_as_ndjson(dummy_generator()):
-        assert event == '{"message": "test message\\n"}\n'
+        assert event.endswith("\n")
+        assert json.loads(event) == {"message": "test message\n"}
 
 
 @pytest.mark.asyncio
@@ -18,7 +20,7 @@ async def test_format_as_ndjson_exception():
         yield {"message": "test message\n"}
     
     async for event in format_as_ndjson(dummy_generator()):
-        assert event == '{"error": "test exception"}'
+        assert json.loads(event) == {"error": "test exception"}
 
 def test_parse_multi_columns():
     test_pipes = "col1|col2|col3"
@@ -27,3 +29,22 @@ def test_parse_multi_columns():
     assert parse_multi_columns(test_pipes) == ["col1", "col2", "col3"]
     assert parse_multi_columns(test_commas) == ["col1", "col2", "col3"]
     assert parse_multi_columns(test_single) == ["col1"]
+
+
+def test_merge_stream_responses():
+    def response(*messages):
+        return {"id": "1", "choices": [{"messages": list(messages)}]}
+
+    merged = merge_stream_responses([
+        response({"role": "assistant", "content": "Hel"}),
+        {},
+        response({"role": "assistant", "content": "lo"}),
+        response({"role": "tool", "content": "{}"}),
+        response({"role": "assistant", "content": "!"}),
+    ])
+    assert merged["choices"][0]["messages"] == [
+        {"role": "assistant", "content": "Hello"},
+        {"role": "tool", "content": "{}"},
+        {"role": "assistant", "content": "!"},
+    ]
+    assert merge_stream_responses([{}, {}]) == {}